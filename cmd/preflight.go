@@ -1,6 +1,7 @@
 package cmd
 
 import (
+	"bufio"
 	"encoding/json"
 	"fmt"
 	"io"
@@ -14,7 +15,10 @@ import (
 	bash_sandboxed "github.com/gartnera/lite-sandbox/tool/bash_sandboxed"
 )
 
-var preflightInstallFlag bool
+var (
+	preflightInstallFlag bool
+	preflightStreamFlag  bool
+)
 
 var preflightCmd = &cobra.Command{
 	Use:   "preflight",
@@ -23,6 +27,9 @@ var preflightCmd = &cobra.Command{
 from stdin and denies Bash tool calls whose commands would pass sandbox validation,
 redirecting Claude to use mcp__lite-sandbox__bash instead.
 
+With --stream, stays running and handles one hook input JSON object per line,
+writing exactly one JSON line per input ({} when the Bash call is allowed).
+
 When invoked from a terminal (or with --install), installs the hook into
 ~/.claude/settings.json.`,
 	RunE: runPreflight,
@@ -30,6 +37,7 @@ When invoked from a terminal (or with --install), installs the hook into
 
 func init() {
 	preflightCmd.Flags().BoolVar(&preflightInstallFlag, "install", false, "Install the preflight hook into ~/.claude/settings.json")
+	preflightCmd.Flags().BoolVar(&preflightStreamFlag, "stream", false, "Handle line-delimited hook inputs until stdin is closed")
 	rootCmd.AddCommand(preflightCmd)
 }
 
@@ -58,6 +66,9 @@ func runPreflight(cmd *cobra.Command, args []string) error {
 	if preflightInstallFlag || term.IsTerminal(int(os.Stdin.Fd())) {
 		return runPreflightInstall()
 	}
+	if preflightStreamFlag {
+		return runPreflightStream()
+	}
 	return runPreflightHook()
 }
 
@@ -69,6 +80,45 @@ func runPreflightHook() error {
 		return nil // fail open
 	}
 
+	output := preflightDecide(data)
+	if output == nil {
+		return nil
+	}
+	enc := json.NewEncoder(os.Stdout)
+	enc.SetIndent("", "  ")
+	return enc.Encode(output)
+}
+
+// runPreflightStream handles one PreToolUse JSON object per stdin line and
+// writes one compact JSON line per input, so a single process can serve
+// many hook invocations. Inputs that are allowed (including malformed
+// ones, which fail open) produce an empty object.
+func runPreflightStream() error {
+	scanner := bufio.NewScanner(os.Stdin)
+	scanner.Buffer(make([]byte, 0, 64*1024), 16*1024*1024)
+	out := bufio.NewWriter(os.Stdout)
+	enc := json.NewEncoder(out)
+
+	for scanner.Scan() {
+		var err error
+		if output := preflightDecide(scanner.Bytes()); output != nil {
+			err = enc.Encode(output)
+		} else {
+			_, err = out.WriteString("{}\n")
+		}
+		if err != nil {
+			return err
+		}
+		if err := out.Flush(); err != nil {
+			return err
+		}
+	}
+	return nil // fail open on read errors
+}
+
+// preflightDecide returns the hook response for a PreToolUse JSON input, or
+// nil if the Bash call should be allowed.
+func preflightDecide(data []byte) *preflightHookOutput {
 	var input preflightHookInput
 	if err := json.Unmarshal(data, &input); err != nil {
 		return nil // fail open
@@ -81,13 +131,11 @@ func runPreflightHook() error {
 
 	// Escalate to user approval if the LLM is explicitly bypassing the sandbox
 	if input.ToolInput.DangerouslyDisableSandbox {
-		output := preflightHookOutput{}
+		output := &preflightHookOutput{}
 		output.HookSpecificOutput.HookEventName = "PreToolUse"
 		output.HookSpecificOutput.PermissionDecision = "ask"
 		output.HookSpecificOutput.PermissionDecisionReason = "This command is bypassing the lite-sandbox (dangerouslyDisableSandbox=true). Please confirm execution."
-		enc := json.NewEncoder(os.Stdout)
-		enc.SetIndent("", "  ")
-		return enc.Encode(output)
+		return output
 	}
 
 	command := input.ToolInput.Command
@@ -117,14 +165,11 @@ func runPreflightHook() error {
 	}
 
 	// Command would pass sandbox validation — deny Bash and redirect
-	output := preflightHookOutput{}
+	output := &preflightHookOutput{}
 	output.HookSpecificOutput.HookEventName = "PreToolUse"
 	output.HookSpecificOutput.PermissionDecision = "deny"
 	output.HookSpecificOutput.PermissionDecisionReason = "This command can run in the lite-sandbox. Use the mcp__lite-sandbox__bash tool instead of the built-in Bash tool."
-
-	enc := json.NewEncoder(os.Stdout)
-	enc.SetIndent("", "  ")
-	return enc.Encode(output)
+	return output
 }
 
 // runPreflightInstall installs the preflight hook into ~/.claude/settings.json.
@@ -4,6 +4,7 @@ import (
 	"encoding/json"
 	"os"
 	"path/filepath"
+	"strings"
 	"testing"
 )
 
@@ -106,6 +107,12 @@ func TestPreflightHookEmptyCommand(t *testing.T) {
 // and calling runPreflightHook, then returning captured stdout.
 func capturePreflightHook(t *testing.T, inputData []byte) string {
 	t.Helper()
+	return capturePreflight(t, inputData, runPreflightHook)
+}
+
+// capturePreflight feeds inputData to run on stdin and returns captured stdout.
+func capturePreflight(t *testing.T, inputData []byte, run func() error) string {
+	t.Helper()
 
 	// Create a pipe to simulate stdin
 	stdinR, stdinW, err := os.Pipe()
@@ -132,7 +139,7 @@ func capturePreflightHook(t *testing.T, inputData []byte) string {
 	os.Stdout = stdoutW
 
 	// Run the hook
-	_ = runPreflightHook()
+	_ = run()
 
 	// Restore and close
 	os.Stdin = oldStdin
@@ -145,6 +152,47 @@ func capturePreflightHook(t *testing.T, inputData []byte) string {
 	return string(buf[:n])
 }
 
+func TestPreflightStream(t *testing.T) {
+	// Each input line should produce exactly one output line, in order
+	tmpDir := t.TempDir()
+
+	valid := preflightHookInput{ToolName: "Bash", CWD: tmpDir}
+	valid.ToolInput.Command = "echo hello"
+	invalid := preflightHookInput{ToolName: "Bash", CWD: tmpDir}
+	invalid.ToolInput.Command = "python script.py"
+
+	var input []byte
+	for _, in := range []preflightHookInput{valid, invalid} {
+		line, err := json.Marshal(in)
+		if err != nil {
+			t.Fatal(err)
+		}
+		input = append(input, line...)
+		input = append(input, '\n')
+	}
+	input = append(input, []byte("{invalid json\n")...)
+
+	output := capturePreflight(t, input, runPreflightStream)
+	lines := strings.Split(strings.TrimSuffix(output, "\n"), "\n")
+	if len(lines) != 3 {
+		t.Fatalf("expected 3 output lines, got %d: %q", len(lines), output)
+	}
+
+	var resp preflightHookOutput
+	if err := json.Unmarshal([]byte(lines[0]), &resp); err != nil {
+		t.Fatalf("failed to parse response JSON: %v", err)
+	}
+	if resp.HookSpecificOutput.PermissionDecision != "deny" {
+		t.Errorf("expected deny for sandbox-valid command, got %s", resp.HookSpecificOutput.PermissionDecision)
+	}
+	if lines[1] != "{}" {
+		t.Errorf("expected {} for invalid command, got: %s", lines[1])
+	}
+	if lines[2] != "{}" {
+		t.Errorf("expected {} for malformed JSON, got: %s", lines[2])
+	}
+}
+
 func TestPreflightHookScriptWithBlockedCommand(t *testing.T) {
 	// A script containing a blocked command should produce no output (allow Bash to handle it)
 	tmpDir := t.TempDir()
@@ -1,13 +1,60 @@
+import asyncio
+import contextlib
+import hashlib
 import os
+import shutil
 import subprocess
+import sys
+from collections.abc import AsyncIterator, Callable
 from pathlib import Path
 from typing import Any
 
 import pytest
-from claude_agent_sdk import ClaudeAgentOptions
+from filelock import FileLock
+from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient
 from claude_agent_sdk.types import PermissionResultAllow, PermissionResultDeny
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BUILD_HASH_FILE = PROJECT_ROOT / ".lite-sandbox.buildhash"
+BINARY_PATH = PROJECT_ROOT / "lite-sandbox"
+BINARY_STR = str(BINARY_PATH)
+
+# Probed once at import so Go-dependent tests are skipped before any work
+_HAS_GO = shutil.which("go") is not None
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests that drive the Go toolchain when it is not installed."""
+    if _HAS_GO:
+        return
+    skip_go = pytest.mark.skip(reason="go toolchain not available")
+    for item in items:
+        if "go_runtime" in item.keywords:
+            item.add_marker(skip_go)
+
+
+def _go_sources():
+    """Yield the Go sources and module files that feed into the binary."""
+    for dirpath, dirnames, filenames in os.walk(PROJECT_ROOT):
+        # Skip hidden dirs like .git and the e2e .venv
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            if name.endswith(".go") or name in ("go.mod", "go.sum"):
+                yield Path(dirpath) / name
+
+
+def _source_hash() -> str:
+    """Hash the paths and contents of every Go source in sorted order."""
+    h = hashlib.blake2b()
+    for src in sorted(_go_sources()):
+        h.update(str(src.relative_to(PROJECT_ROOT)).encode())
+        h.update(src.read_bytes())
+    return h.hexdigest()
+
+
+# The SDK only reads this when serializing the control response, so one
+# instance can be returned for every denied call.
+_DENY_BASH = PermissionResultDeny(message="Use bash instead", interrupt=True)
 
 
 async def deny_builtin_bash(
@@ -15,57 +62,142 @@ async def deny_builtin_bash(
 ) -> PermissionResultAllow | PermissionResultDeny:
     """Allow the MCP sandbox tool freely; deny the built-in Bash tool."""
     if tool_name == "Bash":
-        return PermissionResultDeny(
-            message="Use bash instead", interrupt=True,
-        )
+        return _DENY_BASH
     return PermissionResultAllow(updated_input=input_data)
 
 
+async def _hold_client(
+    options: ClaudeAgentOptions,
+    connected: asyncio.Future,
+    release: asyncio.Event,
+) -> None:
+    async with ClaudeSDKClient(options=options) as client:
+        connected.set_result(client)
+        await release.wait()
+
+
+@contextlib.asynccontextmanager
+async def session_client(
+    options: ClaudeAgentOptions,
+) -> AsyncIterator[ClaudeSDKClient]:
+    """Connect a ClaudeSDKClient that can outlive a single test.
+
+    pytest-asyncio runs fixture setup and teardown in separate tasks, but the
+    SDK's task group must be exited from the task that entered it, so the
+    client is owned by a dedicated task for its whole lifetime.
+    """
+    connected = asyncio.get_running_loop().create_future()
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold_client(options, connected, release))
+    await asyncio.wait({connected, holder}, return_when=asyncio.FIRST_COMPLETED)
+    if not connected.done():
+        holder.result()  # connect failed; surface the exception
+    try:
+        yield connected.result()
+    finally:
+        release.set()
+        await holder
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run the SDK client and subprocess pipes on uvloop where it is available."""
+    if sys.platform == "win32":
+        return asyncio.DefaultEventLoopPolicy()
+    import uvloop
+
+    return uvloop.EventLoopPolicy()
+
+
 @pytest.fixture(scope="session", autouse=True)
 def build_binary():
-    """Build the lite-sandbox binary before running tests."""
-    result = subprocess.run(
-        ["go", "build", "-o", "lite-sandbox"],
-        cwd=PROJECT_ROOT,
-        capture_output=True,
-        text=True,
-    )
-    assert result.returncode == 0, f"go build failed: {result.stderr}"
-    binary = PROJECT_ROOT / "lite-sandbox"
-    assert binary.exists(), "Binary not found after build"
+    """Build the lite-sandbox binary before running tests.
+
+    Each pytest-xdist worker runs this fixture, so the build is serialized
+    with a file lock. The build is skipped when the hash of the Go sources
+    matches the one recorded by the last build, or entirely when
+    LITE_SANDBOX_SKIP_BUILD is set (e.g. CI that pre-builds the binary).
+    """
+    if not os.environ.get("LITE_SANDBOX_SKIP_BUILD"):
+        with FileLock(PROJECT_ROOT / ".build.lock"):
+            source_hash = _source_hash()
+            cached = (
+                BUILD_HASH_FILE.read_text() if BUILD_HASH_FILE.exists() else ""
+            )
+            if cached != source_hash or not BINARY_PATH.exists():
+                if not _HAS_GO:
+                    pytest.skip("go toolchain not available")
+                result = subprocess.run(
+                    ["go", "build", "-o", "lite-sandbox"],
+                    cwd=PROJECT_ROOT,
+                    capture_output=True,
+                    text=True,
+                )
+                assert result.returncode == 0, f"go build failed: {result.stderr}"
+                BUILD_HASH_FILE.write_text(source_hash)
+    assert BINARY_PATH.exists(), "Binary not found after build"
     yield
     # binary is left in place for debugging; gitignored anyway
 
 
+@pytest.fixture(scope="session")
+def monkeypatch_session():
+    """Session-scoped counterpart of pytest's monkeypatch fixture."""
+    with pytest.MonkeyPatch.context() as mp:
+        yield mp
+
+
 @pytest.fixture(scope="session", autouse=True)
-def unset_claudecode_env():
+def unset_claudecode_env(monkeypatch_session):
     """Unset CLAUDECODE env var so the SDK doesn't refuse to launch."""
-    old = os.environ.pop("CLAUDECODE", None)
-    yield
-    if old is not None:
-        os.environ["CLAUDECODE"] = old
+    monkeypatch_session.delenv("CLAUDECODE", raising=False)
 
 
-@pytest.fixture
-def agent_options() -> ClaudeAgentOptions:
-    """ClaudeAgentOptions wired to the sandbox MCP server."""
-    binary = PROJECT_ROOT / "lite-sandbox"
-    return ClaudeAgentOptions(
-        mcp_servers={
-            "lite-sandbox": {
-                "command": str(binary),
-                "args": ["serve-mcp"],
+@pytest.fixture(scope="session")
+def agent_options_factory() -> Callable[..., ClaudeAgentOptions]:
+    """Build ClaudeAgentOptions wired to the sandbox MCP server.
+
+    Callers pass max_turns to bound how long the model may keep going.
+    """
+
+    def build(max_turns: int = 5) -> ClaudeAgentOptions:
+        return ClaudeAgentOptions(
+            mcp_servers={
+                "lite-sandbox": {
+                    "command": BINARY_STR,
+                    "args": ["serve-mcp"],
+                },
             },
-        },
-        system_prompt=(
-            "You have access to a bash MCP tool. "
-            "ALWAYS prefer using the mcp__lite-sandbox__bash tool "
-            "for running shell commands instead of the built-in Bash tool. "
-            "The sandboxed tool is pre-approved and requires no permission prompts."
-        ),
-        allowed_tools=["mcp__lite-sandbox__bash"],
-        can_use_tool=deny_builtin_bash,
-        model="haiku",
-        max_turns=5,
-        cwd=str(PROJECT_ROOT),
-    )
+            system_prompt=(
+                "You have access to a bash MCP tool. "
+                "ALWAYS prefer using the mcp__lite-sandbox__bash tool "
+                "for running shell commands instead of the built-in Bash tool. "
+                "The sandboxed tool is pre-approved and requires no permission prompts."
+            ),
+            allowed_tools=["mcp__lite-sandbox__bash"],
+            can_use_tool=deny_builtin_bash,
+            model="haiku",
+            max_turns=max_turns,
+            cwd=str(PROJECT_ROOT),
+        )
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def agent_options(agent_options_factory) -> ClaudeAgentOptions:
+    """ClaudeAgentOptions wired to the sandbox MCP server."""
+    return agent_options_factory(max_turns=5)
+
+
+@pytest.fixture(scope="session")
+async def sandbox_session(agent_options_factory) -> AsyncIterator[ClaudeSDKClient]:
+    """One agent session (CLI and MCP server) shared by the sandbox tests.
+
+    Each test sends its prompt as a follow-up query on the same
+    conversation instead of spawning its own subprocesses.  Every prompt
+    needs one sandbox call and one answer, so turns are capped at 3 to
+    leave room for a single retry.
+    """
+    async with session_client(agent_options_factory(max_turns=3)) as client:
+        yield client
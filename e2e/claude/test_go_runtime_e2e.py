@@ -3,22 +3,29 @@
 import pytest
 from claude_agent_sdk import ClaudeAgentOptions
 
-from conftest import PROJECT_ROOT, deny_builtin_bash
+from conftest import BINARY_STR, PROJECT_ROOT, deny_builtin_bash
 from test_sandbox_e2e import assert_used_sandbox_tool, run_prompt
 
+CONFIG_PATH = PROJECT_ROOT / "e2e" / "claude" / "config_go_runtime.yaml"
+
+# Output fragments that show `git commit` succeeded
+COMMIT_MARKERS = ("initial commit", "1 file changed", "files changed", "create mode")
+
 
 @pytest.fixture
 def go_runtime_agent_options(tmp_path) -> ClaudeAgentOptions:
-    """ClaudeAgentOptions with Go runtime enabled via custom config."""
-    binary = PROJECT_ROOT / "lite-sandbox"
-    config_path = PROJECT_ROOT / "e2e" / "claude" / "config_go_runtime.yaml"
+    """ClaudeAgentOptions with Go runtime enabled via custom config.
 
+    Each test gets a fresh workspace. The MCP server inherits the host's
+    GOCACHE and GOPATH, so build and module caches stay warm across tests,
+    xdist workers and runs.
+    """
     return ClaudeAgentOptions(
         mcp_servers={
             "lite-sandbox": {
-                "command": str(binary),
+                "command": BINARY_STR,
                 "args": ["serve-mcp"],
-                "env": {"LITE_SANDBOX_CONFIG": str(config_path)},
+                "env": {"LITE_SANDBOX_CONFIG": str(CONFIG_PATH)},
             },
         },
         system_prompt=(
@@ -43,6 +50,7 @@ def go_runtime_agent_options(tmp_path) -> ClaudeAgentOptions:
 
 
 @pytest.mark.asyncio
+@pytest.mark.go_runtime
 async def test_go_project_workflow(go_runtime_agent_options):
     """
     Test a complete Go development workflow:
@@ -94,7 +102,7 @@ Show me the results of the go test and git commit commands.
     assert "Bash" not in tool_names, "Built-in Bash should not be used"
 
     # Check for evidence of successful test run
-    combined_output = response["text"] + " ".join(response["tool_results"])
+    combined_output = response["combined"]
 
     # Test should have passed (look for common go test success indicators)
     assert "PASS" in combined_output or "ok" in combined_output, (
@@ -103,9 +111,6 @@ Show me the results of the go test and git commit commands.
 
     # Commit should have been created (look for commit indicators)
     # Git commit usually outputs something like "initial commit" or a commit hash
-    assert (
-        "initial commit" in combined_output
-        or "1 file changed" in combined_output
-        or "files changed" in combined_output
-        or "create mode" in combined_output
-    ), f"Expected git commit to succeed. Output: {combined_output}"
+    assert any(marker in combined_output for marker in COMMIT_MARKERS), (
+        f"Expected git commit to succeed. Output: {combined_output}"
+    )
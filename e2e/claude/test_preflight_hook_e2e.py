@@ -7,20 +7,10 @@ tells Claude to use mcp__lite-sandbox__bash.
 """
 
 import asyncio
-import json
-from pathlib import Path
-from typing import Any
 
+import orjson
 import pytest
-from claude_agent_sdk import (
-    ClaudeAgentOptions,
-    ClaudeSDKClient,
-    AssistantMessage,
-    ResultMessage,
-    TextBlock,
-    ToolUseBlock,
-    ToolResultBlock,
-)
+from claude_agent_sdk import ClaudeAgentOptions
 from claude_agent_sdk.types import (
     HookContext,
     HookInput,
@@ -28,44 +18,98 @@ from claude_agent_sdk.types import (
     HookMatcher,
 )
 
-PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-
-
-async def preflight_hook(
-    input_data: HookInput,
-    tool_use_id: str | None,
-    context: HookContext,
-) -> HookJSONOutput:
-    """PreToolUse hook that delegates to the lite-sandbox preflight binary.
-
-    Pipes the hook input JSON to `lite-sandbox preflight` on stdin and returns
-    the parsed JSON output.  If the binary produces no output (command would
-    fail sandbox validation) an empty dict is returned, allowing the Bash call.
-    """
-    binary = PROJECT_ROOT / "lite-sandbox"
+from conftest import BINARY_STR, PROJECT_ROOT
+from test_sandbox_e2e import run_prompt
 
-    hook_json = json.dumps({
-        "tool_name": input_data.get("tool_name", ""),
-        "tool_input": input_data.get("tool_input", {}),
-        "cwd": input_data.get("cwd", ""),
-    }).encode()
 
+async def _run_preflight_once(hook_json: bytes) -> bytes:
+    """Pipe one hook input to a fresh `lite-sandbox preflight` process."""
     proc = await asyncio.create_subprocess_exec(
-        str(binary), "preflight",
+        BINARY_STR, "preflight",
         stdin=asyncio.subprocess.PIPE,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.DEVNULL,
     )
     stdout, _ = await proc.communicate(hook_json)
+    return stdout.strip()
 
-    output = stdout.strip()
-    if output:
-        return json.loads(output)
-    return {}
 
+class PreflightProcess:
+    """A long-lived `lite-sandbox preflight --stream` coprocess.
 
-@pytest.fixture
-def preflight_agent_options() -> ClaudeAgentOptions:
+    Hook inputs are written one JSON object per line and each reply is read
+    back as a single line, so the Go binary starts once per session instead
+    of once per Bash attempt.  If the coprocess has exited (e.g. a binary
+    without --stream), requests fall back to a one-shot preflight process.
+    """
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self._proc = proc
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def start(cls) -> "PreflightProcess":
+        proc = await asyncio.create_subprocess_exec(
+            BINARY_STR, "preflight", "--stream",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        return cls(proc)
+
+    async def close(self) -> None:
+        if self._proc.returncode is None:
+            self._proc.stdin.close()
+        await self._proc.wait()
+
+    async def _request(self, hook_json: bytes) -> bytes:
+        # Concurrent hooks must not interleave their request/reply lines
+        async with self._lock:
+            if self._proc.returncode is None:
+                try:
+                    self._proc.stdin.write(hook_json + b"\n")
+                    await self._proc.stdin.drain()
+                    line = await self._proc.stdout.readline()
+                except (BrokenPipeError, ConnectionResetError):
+                    line = b""
+                if line:
+                    return line.strip()
+        return await _run_preflight_once(hook_json)
+
+    async def hook(
+        self,
+        input_data: HookInput,
+        tool_use_id: str | None,
+        context: HookContext,
+    ) -> HookJSONOutput:
+        """PreToolUse hook that delegates to the lite-sandbox preflight binary.
+
+        Sends the hook input JSON to the preflight process and returns the
+        parsed JSON output.  If the command would fail sandbox validation the
+        reply is empty (`{}` in stream mode), allowing the Bash call.
+        """
+        hook_json = orjson.dumps({
+            "tool_name": input_data.get("tool_name", ""),
+            "tool_input": input_data.get("tool_input", {}),
+            "cwd": input_data.get("cwd", ""),
+        })
+
+        output = await self._request(hook_json)
+        if output:
+            return orjson.loads(output)
+        return {}
+
+
+@pytest.fixture(scope="session")
+async def preflight_proc():
+    """One preflight coprocess shared by every hook invocation."""
+    proc = await PreflightProcess.start()
+    yield proc
+    await proc.close()
+
+
+@pytest.fixture(scope="session")
+def preflight_agent_options(preflight_proc) -> ClaudeAgentOptions:
     """Agent options using the preflight hook instead of system prompt guidance.
 
     Key differences from the standard agent_options fixture:
@@ -74,11 +118,10 @@ def preflight_agent_options() -> ClaudeAgentOptions:
     - Both Bash and mcp__lite-sandbox__bash are allowed
     - A PreToolUse hook backed by the real binary handles redirection
     """
-    binary = PROJECT_ROOT / "lite-sandbox"
     return ClaudeAgentOptions(
         mcp_servers={
             "lite-sandbox": {
-                "command": str(binary),
+                "command": BINARY_STR,
                 "args": ["serve-mcp"],
             },
         },
@@ -87,7 +130,7 @@ def preflight_agent_options() -> ClaudeAgentOptions:
             "PreToolUse": [
                 HookMatcher(
                     matcher="Bash",
-                    hooks=[preflight_hook],
+                    hooks=[preflight_proc.hook],
                 ),
             ],
         },
@@ -97,42 +140,6 @@ def preflight_agent_options() -> ClaudeAgentOptions:
     )
 
 
-async def run_prompt(prompt: str, options: ClaudeAgentOptions) -> dict:
-    """Send a prompt and collect tool calls, text, and tool results."""
-    tool_calls: list[ToolUseBlock] = []
-    text_blocks: list[str] = []
-    tool_results: list[str] = []
-    result = None
-
-    async with ClaudeSDKClient(options=options) as client:
-        await client.query(prompt)
-        async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        text_blocks.append(block.text)
-                    elif isinstance(block, ToolUseBlock):
-                        tool_calls.append(block)
-                    elif isinstance(block, ToolResultBlock):
-                        content = block.content if block.content else ""
-                        if isinstance(content, list):
-                            content = " ".join(
-                                item.get("text", "")
-                                for item in content
-                                if isinstance(item, dict)
-                            )
-                        tool_results.append(content)
-            elif isinstance(message, ResultMessage):
-                result = message
-
-    return {
-        "tool_calls": tool_calls,
-        "text": "\n".join(text_blocks),
-        "tool_results": tool_results,
-        "result": result,
-    }
-
-
 @pytest.mark.asyncio
 async def test_preflight_redirects_to_sandbox(preflight_agent_options):
     """Without any system prompt guidance, the hook should redirect Bash to the sandbox.
@@ -155,5 +162,5 @@ async def test_preflight_redirects_to_sandbox(preflight_agent_options):
     ), f"Expected mcp__lite-sandbox__bash tool call, got: {tool_names}"
 
     # Verify the command actually ran successfully
-    combined = response["text"] + " ".join(response["tool_results"])
+    combined = response["combined"]
     assert "go.mod" in combined, f"Expected go.mod in output: {combined}"